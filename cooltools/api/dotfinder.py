@@ -74,7 +74,7 @@ and second to extract significantly enriched pixels.
     even more stringent q-value threshold.
 """
 
-from functools import partial, reduce
+from functools import partial
 import multiprocess as mp
 import logging
 import warnings
@@ -84,6 +84,7 @@ from scipy.linalg import toeplitz
 from scipy.ndimage import convolve
 from scipy.stats import poisson
 from scipy.sparse import coo_matrix
+import numba
 import numpy as np
 import pandas as pd
 from sklearn.cluster import Birch
@@ -509,11 +510,121 @@ def generate_tiles_diag_band(clr, view_df, pad_size, tile_size, band_to_cover):
                 yield region_name, tile_span_i, tile_span_j
 
 
+@numba.njit(fastmath=True, cache=True)
+def _convolve_and_count_nans_fused(O_bal, E_bal, N_bal, kernel_stack, footprint_stack):
+    """
+    Convolve balanced observed and expected matrices with a stack of
+    same-sized kernels and count NaNs in every kernel's footprint, all
+    kernels fused into a single pass over the tile (one read of the input
+    serves every kernel). Matches scipy.ndimage.convolve with
+    mode="constant" and cval=0.0 for the data, cval=1 for the NaN-mask.
+
+    Kept single-threaded on purpose: tiles are already processed in
+    parallel by the worker pool, and numba's threading layer is not
+    fork-safe once engaged in the parent process.
+
+    Returns (KO, KE, NN) stacks of shape (n_kernels, *O_bal.shape).
+    """
+    n_kernels, k_height, k_width = kernel_stack.shape
+    height, width = O_bal.shape
+    w_i = (k_height - 1) // 2
+    w_j = (k_width - 1) // 2
+    KO = np.empty((n_kernels, height, width), dtype=np.float64)
+    KE = np.empty((n_kernels, height, width), dtype=np.float64)
+    NN = np.empty((n_kernels, height, width), dtype=np.int64)
+    for i in range(height):
+        acc_o = np.empty(n_kernels, dtype=np.float64)
+        acc_e = np.empty(n_kernels, dtype=np.float64)
+        acc_n = np.empty(n_kernels, dtype=np.int64)
+        for j in range(width):
+            for k in range(n_kernels):
+                acc_o[k] = 0.0
+                acc_e[k] = 0.0
+                acc_n[k] = 0
+            for di in range(-w_i, w_i + 1):
+                ii = i + di
+                for dj in range(-w_j, w_j + 1):
+                    jj = j + dj
+                    if (0 <= ii) and (ii < height) and (0 <= jj) and (jj < width):
+                        o_val = O_bal[ii, jj]
+                        e_val = E_bal[ii, jj]
+                        is_nan = N_bal[ii, jj]
+                        for k in range(n_kernels):
+                            # ndimage.convolve flips the kernel, hence w - d:
+                            k_val = kernel_stack[k, w_i - di, w_j - dj]
+                            acc_o[k] += o_val * k_val
+                            acc_e[k] += e_val * k_val
+                            if is_nan and footprint_stack[k, w_i - di, w_j - dj]:
+                                acc_n[k] += 1
+                    else:
+                        # there are only NaNs beyond the tile boundary:
+                        for k in range(n_kernels):
+                            if footprint_stack[k, w_i - di, w_j - dj]:
+                                acc_n[k] += 1
+            for k in range(n_kernels):
+                KO[k, i, j] = acc_o[k]
+                KE[k, i, j] = acc_e[k]
+                NN[k, i, j] = acc_n[k]
+    return KO, KE, NN
+
+
+def _convolve_and_count_nans_cupy(O_bal, E_bal, N_bal, kernel_stack, footprint_stack):
+    """
+    GPU counterpart of `_convolve_and_count_nans_fused`: convolve balanced
+    observed and expected matrices with a stack of same-sized kernels and
+    count NaNs in every kernel's footprint on the device, using CuPy's
+    ndimage convolution. The tile is pushed to the GPU once and serves
+    every kernel; results are pulled back as numpy stacks of the same
+    shape and dtypes as the numba path produces.
+
+    Requires cupy and a CUDA-capable device.
+    """
+    try:
+        import cupy as cp
+        from cupyx.scipy.ndimage import convolve as cupy_convolve
+    except ImportError:
+        raise ImportError("The cupy module is required to use GPU convolution")
+
+    n_kernels = kernel_stack.shape[0]
+    O_dev = cp.asarray(O_bal)
+    E_dev = cp.asarray(E_bal)
+    N_dev = cp.asarray(N_bal, dtype=cp.int64)
+    KO = np.empty((n_kernels, *O_bal.shape), dtype=np.float64)
+    KE = np.empty((n_kernels, *O_bal.shape), dtype=np.float64)
+    NN = np.empty((n_kernels, *O_bal.shape), dtype=np.int64)
+    for k in range(n_kernels):
+        kernel_dev = cp.asarray(kernel_stack[k])
+        footprint_dev = cp.asarray(footprint_stack[k], dtype=cp.int64)
+        KO[k] = cp.asnumpy(cupy_convolve(O_dev, kernel_dev, mode="constant", cval=0.0))
+        KE[k] = cp.asnumpy(cupy_convolve(E_dev, kernel_dev, mode="constant", cval=0.0))
+        # cval=1 - there are only NaNs beyond the tile boundary:
+        NN[k] = cp.asnumpy(cupy_convolve(N_dev, footprint_dev, mode="constant", cval=1))
+    return KO, KE, NN
+
+
+def _stack_kernels(kernels):
+    """
+    Stack same-sized kernels into the (kernel_stack, footprint_stack) pair
+    consumed by the fused convolution. Returns None when kernels differ in
+    shape and cannot be fused. Stacking once per run (e.g. in the worker
+    initializer) spares every tile the conversion and lets the jitted
+    convolution reuse its compiled specialization for these arrays.
+    """
+    if len({np.shape(k) for k in kernels.values()}) != 1:
+        return None
+    kernel_stack = np.stack(
+        [np.asarray(kernel, dtype=np.float64) for kernel in kernels.values()]
+    )
+    # nonzero footprints of the kernels, for counting NaNs around pixels:
+    return kernel_stack, kernel_stack != 0
+
+
 ########################################################################
 # this is the MAIN function to get locally adjusted expected
 ########################################################################
 def get_adjusted_expected_tile_some_nans(
-    origin_ij, observed, expected, bal_weights, kernels
+    origin_ij, observed, expected, bal_weights, kernels, fused_conv=False,
+    kernel_stacks=None, gpu_conv=False,
 ):
     """
     Get locally adjusted expected for a collection of local-filters (kernels).
@@ -594,6 +705,18 @@ def get_adjusted_expected_tile_some_nans(
         each kernel.
         Note, scipy.ndimage.convolve first flips kernel
         and only then applies it to matrix.
+    fused_conv : bool
+        When True and all kernels are of the same shape, perform the
+        convolutions for all kernels in a single numba-jitted pass over
+        the tile, instead of one scipy convolution per kernel.
+    kernel_stacks : tuple or None
+        Pre-stacked (kernel_stack, footprint_stack) pair from
+        `_stack_kernels`, to reuse across tiles. When None and
+        'fused_conv' is requested, the stacks are built on the fly.
+    gpu_conv : bool
+        Experimental: when True and all kernels are of the same shape,
+        run the convolutions for all kernels on the GPU with CuPy.
+        Requires cupy and a CUDA-capable device.
 
     Returns
     -------
@@ -673,55 +796,80 @@ def get_adjusted_expected_tile_some_nans(
     # pack it into DataFrame to accumulate results:
     peaks_df = pd.DataFrame({"bin1_id": i.flatten() + io, "bin2_id": j.flatten() + jo})
 
-    with np.errstate(divide="ignore", invalid="ignore"):
-        for kernel_name, kernel in kernels.items():
-            ###############################
-            # kernel-specific calculations:
-            ###############################
-            # kernel paramters such as width etc
-            # are taken into account implicitly ...
-            ########################################
-            # a matrix filled with the kernel-weighted sums
-            # based on a balanced observed matrix:
-            KO = convolve(O_bal, kernel, mode="constant", cval=0.0, origin=0)
-            # a matrix filled with the kernel-weighted sums
-            # based on a balanced expected matrix:
-            KE = convolve(E_bal, kernel, mode="constant", cval=0.0, origin=0)
-            # get number of NaNs in a vicinity of every
-            # pixel (kernel's nonzero footprint)
-            # based on the NaN-matrix N_bal.
-            # N_bal is shared NaNs between O_bal E_bal,
-            NN = convolve(
-                N_bal.astype(np.int64),
-                # we have to use kernel's
-                # nonzero footprint:
-                (kernel != 0).astype(np.int64),
-                mode="constant",
-                # there are only NaNs
-                # beyond the boundary:
-                cval=1,
-                origin=0,
+    # fused/GPU convolution requires same-sized kernels, fall back otherwise:
+    if (fused_conv or gpu_conv) and kernel_stacks is None:
+        kernel_stacks = _stack_kernels(kernels)
+    if (fused_conv or gpu_conv) and kernel_stacks is not None:
+        kernel_stack, footprint_stack = kernel_stacks
+        if gpu_conv:
+            KO_stack, KE_stack, NN_stack = _convolve_and_count_nans_cupy(
+                O_bal, E_bal, N_bal, kernel_stack, footprint_stack
             )
-            ######################################
-            # using cval=0 for actual data and
-            # cval=1 for NaNs matrix reduces
-            # "boundary issue" to the "number of
-            # NaNs"-issue
-            # ####################################
-            # now finally, E_raw*(KO/KE), as the
-            # locally-adjusted expected with raw counts as values:
-            Ek_raw = np.multiply(E_raw, np.divide(KO, KE))
-
-            logging.debug(
-                f"Convolution with kernel {kernel_name} is done for tile @ {io} {jo}."
+        else:
+            KO_stack, KE_stack, NN_stack = _convolve_and_count_nans_fused(
+                O_bal, E_bal, N_bal, kernel_stack, footprint_stack
             )
-            #
-            # accumulation into single DataFrame:
-            # store locally adjusted expected for each kernel
-            # and number of NaNs in the footprint of each kernel
-            peaks_df[f"la_exp.{kernel_name}.value"] = Ek_raw.flatten()
-            peaks_df[f"la_exp.{kernel_name}.nnans"] = NN.flatten()
-            # do all the filter/logic/masking etc on the complete DataFrame ...
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for k_idx, kernel_name in enumerate(kernels):
+                # E_raw*(KO/KE), as the locally-adjusted expected
+                # with raw counts as values:
+                Ek_raw = np.multiply(
+                    E_raw, np.divide(KO_stack[k_idx], KE_stack[k_idx])
+                )
+                # store locally adjusted expected for each kernel
+                # and number of NaNs in the footprint of each kernel
+                peaks_df[f"la_exp.{kernel_name}.value"] = Ek_raw.flatten()
+                peaks_df[f"la_exp.{kernel_name}.nnans"] = NN_stack[k_idx].flatten()
+    else:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for kernel_name, kernel in kernels.items():
+                ###############################
+                # kernel-specific calculations:
+                ###############################
+                # kernel paramters such as width etc
+                # are taken into account implicitly ...
+                ########################################
+                # a matrix filled with the kernel-weighted sums
+                # based on a balanced observed matrix:
+                KO = convolve(O_bal, kernel, mode="constant", cval=0.0, origin=0)
+                # a matrix filled with the kernel-weighted sums
+                # based on a balanced expected matrix:
+                KE = convolve(E_bal, kernel, mode="constant", cval=0.0, origin=0)
+                # get number of NaNs in a vicinity of every
+                # pixel (kernel's nonzero footprint)
+                # based on the NaN-matrix N_bal.
+                # N_bal is shared NaNs between O_bal E_bal,
+                NN = convolve(
+                    N_bal.astype(np.int64),
+                    # we have to use kernel's
+                    # nonzero footprint:
+                    (kernel != 0).astype(np.int64),
+                    mode="constant",
+                    # there are only NaNs
+                    # beyond the boundary:
+                    cval=1,
+                    origin=0,
+                )
+                ######################################
+                # using cval=0 for actual data and
+                # cval=1 for NaNs matrix reduces
+                # "boundary issue" to the "number of
+                # NaNs"-issue
+                # ####################################
+                # now finally, E_raw*(KO/KE), as the
+                # locally-adjusted expected with raw counts as values:
+                Ek_raw = np.multiply(E_raw, np.divide(KO, KE))
+
+                logging.debug(
+                    f"Convolution with kernel {kernel_name} is done for tile @ {io} {jo}."
+                )
+                #
+                # accumulation into single DataFrame:
+                # store locally adjusted expected for each kernel
+                # and number of NaNs in the footprint of each kernel
+                peaks_df[f"la_exp.{kernel_name}.value"] = Ek_raw.flatten()
+                peaks_df[f"la_exp.{kernel_name}.nnans"] = NN.flatten()
+                # do all the filter/logic/masking etc on the complete DataFrame ...
     #####################################
     # downstream stuff is supposed to be
     # aggregated over all kernels ...
@@ -744,15 +892,96 @@ def get_adjusted_expected_tile_some_nans(
 ##################################
 # step-specific dot-calling functions
 ##################################
+def _score_tile_raw(
+    tile_cij,
+    clr,
+    exp_arrays_by_region,
+    bal_weights,
+    kernels,
+    max_nans_tolerated,
+    band_to_cover,
+    fused_conv=False,
+    kernel_stacks=None,
+    gpu_conv=False,
+):
+    """
+    Scoring core of `score_tile`: fetch a tile, calculate locally adjusted
+    expected for every kernel and build the boolean mask of eligible pixels
+    (upper-triangle, inside the band, NaN-compliant). Returns the raw
+    per-pixel DataFrame and the mask without slicing them, so that callers
+    can consume plain ndarray columns (e.g. for histogramming) instead of
+    a materialized copy.
+    """
+    # unpack tile's coordinates
+    region_name, tile_span_i, tile_span_j = tile_cij
+    tile_start_ij = (tile_span_i[0], tile_span_j[0])
+
+    # expected of the region as a Toeplitz matrix - prebuilt per region
+    # by the worker initializer, or constructed here from a plain array:
+    lazy_exp = exp_arrays_by_region[region_name]
+    if not isinstance(lazy_exp, LazyToeplitz):
+        lazy_exp = LazyToeplitz(lazy_exp)
+
+    # Fetch the RAW observed tile as sparse COO and densify only the pixels
+    # that can contribute to scored results: entries further above the
+    # diagonal than 'band_to_cover' plus a kernel-sized margin are beyond
+    # the reach of any kernel footprint of an eligible pixel and would be
+    # discarded by post-processing anyway.
+    obs_coo = clr.matrix(balance=False, sparse=True)[
+        slice(*tile_span_i), slice(*tile_span_j)
+    ]
+    kernel_margin = max(len(k) for k in kernels.values())
+    # distance from the diagonal, in bins, for every sparse entry:
+    obs_dist = (obs_coo.col + tile_span_j[0]) - (obs_coo.row + tile_span_i[0])
+    in_reach = obs_dist < (band_to_cover + kernel_margin)
+    # counts as int32: standard coolers store them as int32 already, and the
+    # narrower dtype halves the tile's memory traffic otherwise. Balancing
+    # weights are kept at float64 on purpose - float32 weights would perturb
+    # locally adjusted expected and the tail p-values derived from it.
+    observed = np.zeros(obs_coo.shape, dtype=np.int32)
+    observed[obs_coo.row[in_reach], obs_coo.col[in_reach]] = obs_coo.data[in_reach]
+    # expected as a rectangular tile - a read-only strided view that avoids
+    # materializing the full Toeplitz tile (it is copied downstream anyway):
+    expected = lazy_exp.strided_view((slice(*tile_span_i), slice(*tile_span_j)))
+    # slice of balance_weight for row-span and column-span (no-copy views):
+    bal_weight_i = bal_weights[slice(*tile_span_i)]
+    bal_weight_j = bal_weights[slice(*tile_span_j)]
+
+    # do the convolutions
+    result = get_adjusted_expected_tile_some_nans(
+        origin_ij=tile_start_ij,
+        observed=observed,
+        expected=expected,
+        bal_weights=(bal_weight_i, bal_weight_j),
+        kernels=kernels,
+        fused_conv=fused_conv,
+        kernel_stacks=kernel_stacks,
+        gpu_conv=gpu_conv,
+    )
+
+    # Post-processing filters, accumulated in a single ndarray mask
+    bin1_id = result["bin1_id"].to_numpy()
+    bin2_id = result["bin2_id"].to_numpy()
+    # (0) keep only upper-triangle pixels:
+    # (1) exclude pixels that connect loci further than 'band_to_cover' apart:
+    mask = (bin1_id < bin2_id) & (bin1_id > (bin2_id - band_to_cover))
+    # (2) identify pixels that pass number of NaNs compliance test for ALL kernels:
+    for k in kernels:
+        mask &= result[f"la_exp.{k}.nnans"].to_numpy() < max_nans_tolerated
+    return result, mask
+
+
 def score_tile(
     tile_cij,
     clr,
-    expected_indexed,
-    expected_value_col,
-    clr_weight_name,
+    exp_arrays_by_region,
+    bal_weights,
     kernels,
     max_nans_tolerated,
     band_to_cover,
+    fused_conv=False,
+    kernel_stacks=None,
+    gpu_conv=False,
 ):
     """
     The main working function that given a tile of a heatmap, applies kernels to
@@ -768,13 +997,12 @@ def score_tile(
         tile_span_j = (start_j, end_j).
     clr : cooler
         Cooler object to use to extract Hi-C heatmap data.
-    expected_indexed : pandas.DataFrame
-        DataFrame with cis-expected, indexed with 'region1', 'region2', 'dist'.
-    expected_value_col : str
-        Name of a value column in expected DataFrame
-    clr_weight_name : str
-        Name of a value column with balancing weights in a cooler.bins()
-        DataFrame. Typically 'weight'.
+    exp_arrays_by_region : dict
+        A dictionary with region names as keys and ndarrays of cis-expected
+        values (by diagonal), or LazyToeplitz views thereof, as values.
+    bal_weights : numpy.ndarray
+        1D array of balancing weights for all bins of the cooler,
+        extracted from cooler.bins() once, prior to tiling.
     kernels : dict
         A dictionary with keys being kernels names and values being ndarrays
         representing those kernels.
@@ -783,6 +1011,15 @@ def score_tile(
     band_to_cover : int
         Results would be stored only for pixels connecting loci closer than
         'band_to_cover'.
+    fused_conv : bool
+        Whether to calculate locally adjusted expected using the fused
+        numba-jitted convolution, instead of per-kernel scipy ones.
+    kernel_stacks : tuple or None
+        Pre-stacked (kernel_stack, footprint_stack) pair for the fused
+        convolution, built once per run by `_stack_kernels`.
+    gpu_conv : bool
+        Experimental: run the convolutions on the GPU with CuPy
+        (requires cupy and a CUDA-capable device).
 
     Returns
     -------
@@ -793,49 +1030,20 @@ def score_tile(
         pixels DataFrame for eligible pixels of a given tile.
 
     """
-    # unpack tile's coordinates
-    region_name, tile_span_i, tile_span_j = tile_cij
-    tile_start_ij = (tile_span_i[0], tile_span_j[0])
-
-    # we have to do it for every tile, because
-    # region_name is not known apriori (maybe move outside)
-    # use .loc[region, region] for symmetric cis regions to conform with expected v1.0
-    lazy_exp = LazyToeplitz(
-        expected_indexed.loc[region_name, region_name][expected_value_col].to_numpy()
-    )
-
-    # RAW observed matrix slice:
-    observed = clr.matrix(balance=False)[slice(*tile_span_i), slice(*tile_span_j)]
-    # expected as a rectangular tile :
-    expected = lazy_exp[slice(*tile_span_i), slice(*tile_span_j)]
-    # slice of balance_weight for row-span and column-span :
-    bal_weight_i = clr.bins()[slice(*tile_span_i)][clr_weight_name].to_numpy()
-    bal_weight_j = clr.bins()[slice(*tile_span_j)][clr_weight_name].to_numpy()
-
-    # do the convolutions
-    result = get_adjusted_expected_tile_some_nans(
-        origin_ij=tile_start_ij,
-        observed=observed,
-        expected=expected,
-        bal_weights=(bal_weight_i, bal_weight_j),
-        kernels=kernels,
-    )
-
-    # Post-processing filters
-    # (0) keep only upper-triangle pixels:
-    upper_band = result["bin1_id"] < result["bin2_id"]
-
-    # (1) exclude pixels that connect loci further than 'band_to_cover' apart:
-    is_inside_band = result["bin1_id"] > (result["bin2_id"] - band_to_cover)
-
-    # (2) identify pixels that pass number of NaNs compliance test for ALL kernels:
-    does_comply_nans = np.all(
-        result[[f"la_exp.{k}.nnans" for k in kernels]] < max_nans_tolerated, axis=1
+    result, mask = _score_tile_raw(
+        tile_cij,
+        clr,
+        exp_arrays_by_region,
+        bal_weights,
+        kernels,
+        max_nans_tolerated,
+        band_to_cover,
+        fused_conv=fused_conv,
+        kernel_stacks=kernel_stacks,
+        gpu_conv=gpu_conv,
     )
     # so, selecting inside band and nNaNs compliant results:
-    res_df = result[upper_band & is_inside_band & does_comply_nans].reset_index(
-        drop=True
-    )
+    res_df = result[mask].reset_index(drop=True)
     #
     # so return only bare minimum: bin_ids , observed-raw counts
     # and locally adjusted expected estimates for every kernel
@@ -844,6 +1052,53 @@ def score_tile(
     ].astype(dtype={f"la_exp.{k}.value": "float64" for k in kernels})
 
 
+def _histogram_la_exp(obs_arr, la_exp_arrs, ledges):
+    """
+    Histogramming core of `histogram_scored_pixels`, operating on plain
+    ndarrays: count (lambda-bin, observed count) co-occurences for every
+    kernel in a single bincount pass over flat-encoded keys.
+
+    Parameters
+    ----------
+    obs_arr : np.ndarray
+        1D array of raw observed counts of the scored pixels.
+    la_exp_arrs : dict
+        A dictionary of 1D arrays of locally adjusted expected of the
+        scored pixels, keyed by kernel name.
+    ledges : ndarray
+        An ndarray with bin lambda-edges for groupping locally adjusted
+        expecteds. Left-most bin (-inf, 1], and right-most one (value,+inf].
+
+    Returns
+    -------
+    uniq_obs : np.ndarray
+        Sorted unique observed counts - the rows of the histograms.
+    counts_by_kernel : dict
+        {kernel_name : 2D int64 array of shape (len(uniq_obs), len(ledges)-1)}
+    """
+    num_lbins = len(ledges) - 1
+    # observed counts present in this chunk and their dense encoding,
+    # they make up the index of the histograms (same as the former groupby):
+    uniq_obs, obs_idx = np.unique(obs_arr, return_inverse=True)
+    num_obs = len(uniq_obs)
+    counts_by_kernel = {}
+    for k, la_exp in la_exp_arrs.items():
+        # lambda-bin index for kernel-type "k", same as pd.cut with right-closed
+        # lambda-bins (ledges[i], ledges[i+1]], but without Categorical machinery:
+        lbin_idx = np.searchsorted(ledges, la_exp, side="left") - 1
+        # pixels with NaN locally adjusted expected do not belong to any lambda-bin:
+        valid = ~np.isnan(la_exp)
+        # encode (lambda-bin, observed count) pairs into flat keys and
+        # histogram them in a single C-level bincount pass:
+        flat_idx = lbin_idx[valid] * num_obs + obs_idx[valid]
+        counts_by_kernel[k] = (
+            np.bincount(flat_idx, minlength=num_lbins * num_obs)
+            .reshape(num_lbins, num_obs)
+            .T
+        )
+    return uniq_obs, counts_by_kernel
+
+
 def histogram_scored_pixels(
     scored_df, kernels, ledges, obs_raw_name=observed_count_name
 ):
@@ -883,25 +1138,25 @@ def histogram_scored_pixels(
     returning histograms corresponding to the chunks of scored pixels.
     """
 
-    hists = {}
-    for k in kernels:
-        #  we would need to generate a bunch of these histograms for all of the
-        # kernel types:
-        # needs to be lambda-binned             : scored_df["la_exp."+k+".value"]
-        # needs to be histogrammed in every bin : scored_df["obs.raw"]
-        #
-        # lambda-bin index for kernel-type "k":
-        lbins = pd.cut(scored_df[f"la_exp.{k}.value"], ledges)
-        # group scored_df by counts and lambda-bins to contructs histograms:
-        hists[k] = (
-            scored_df.groupby([obs_raw_name, lbins], dropna=False, observed=False)[
-                f"la_exp.{k}.value"
-            ]
-            .count()
-            .unstack()
-            .fillna(0)
-            .astype(np.int64)
+    #  we would need to generate a bunch of these histograms for all of the
+    # kernel types:
+    # needs to be lambda-binned             : scored_df["la_exp."+k+".value"]
+    # needs to be histogrammed in every bin : scored_df["obs.raw"]
+    uniq_obs, counts_by_kernel = _histogram_la_exp(
+        scored_df[obs_raw_name].to_numpy(),
+        {k: scored_df[f"la_exp.{k}.value"].to_numpy() for k in kernels},
+        ledges,
+    )
+    # wrap into DataFrames indexed by observed counts, with lambda-bin
+    # intervals as columns - same layout as the former groupby/unstack:
+    hists = {
+        k: pd.DataFrame(
+            counts_by_kernel[k],
+            index=pd.Index(uniq_obs, name=obs_raw_name),
+            columns=pd.IntervalIndex.from_breaks(ledges, name=f"la_exp.{k}.value"),
         )
+        for k in kernels
+    }
     # return a dict of DataFrames with a bunch of histograms:
     return hists
 
@@ -972,11 +1227,15 @@ def determine_thresholds(gw_hist, fdr):
         #   poisson.pmf(rcs_hist.index, lambda)[::-1].cumsum()[::-1]
         # unit Poisson is a collection of 1-CDF distributions for each l-chunk
         # same dimensions as rcs_hist - matching lchunks and observed values:
-        unit_Poisson = pd.DataFrame().reindex_like(rcs_hist)
-        for lbin in rcs_hist.columns:
-            # Number of occurances in Poisson distribution for which we estimate
-            _occurances = rcs_hist.index.to_numpy()
-            unit_Poisson[lbin] = poisson.sf(_occurances, lbin.right)
+        # numbers of occurances in Poisson distribution for which we estimate
+        _occurances = rcs_hist.index.to_numpy()
+        _lambdas = pd.IntervalIndex(rcs_hist.columns).right.to_numpy()
+        # single vectorized `sf` call over (occurances x lambda-bins):
+        unit_Poisson = pd.DataFrame(
+            poisson.sf(_occurances[:, None], _lambdas[None, :]),
+            index=rcs_hist.index,
+            columns=rcs_hist.columns,
+        )
         # normalize unit-Poisson distr for the total pixel counts per lambda-bin
         unit_Poisson = norm * unit_Poisson
 
@@ -1028,15 +1287,16 @@ def extract_scored_pixels(scored_df, thresholds, obs_raw_name=observed_count_nam
     compliant_pixel_masks = []
     for kernel_name, threshold in thresholds.items():
         # locally adjusted expected (lambda) of the scored pixels:
-        lambda_of_pixels = scored_df[f"la_exp.{kernel_name}.value"]
+        lambda_of_pixels = scored_df[f"la_exp.{kernel_name}.value"].to_numpy()
         # reconstruct edges of lambda bins from threshold's index:
         ledges_reconstruct = np.r_[threshold.index.left, threshold.index.right[-1]]
-        # find indices of lambda-bins where pixels belong
-        lbin_idx = pd.cut(lambda_of_pixels, ledges_reconstruct, labels=False)
+        # find indices of lambda-bins where pixels belong - searchsorted on
+        # the right-closed bin edges, equivalent to pd.cut(..., labels=False):
+        lbin_idx = np.searchsorted(ledges_reconstruct, lambda_of_pixels, side="left") - 1
         # extract threholds for every pixel, based on lambda-bin each of the belongs
-        threshold_of_pixels = threshold.iloc[lbin_idx]
+        threshold_of_pixels = threshold.to_numpy()[lbin_idx]
         compliant_pixel_masks.append(
-            scored_df[obs_raw_name].to_numpy() >= threshold_of_pixels.to_numpy()
+            scored_df[obs_raw_name].to_numpy() >= threshold_of_pixels
         )
     # return pixels from 'scored_df' that satisfy FDR thresholds for all kernels:
     return scored_df[np.all(compliant_pixel_masks, axis=0)]
@@ -1047,6 +1307,7 @@ def clustering_step(
     dots_clustering_radius,
     assigned_regions_name="region",
     obs_raw_name=observed_count_name,
+    nproc=1,
 ):
     """
     Group together adjacent significant pixels into clusters after
@@ -1065,6 +1326,8 @@ def clustering_step(
         before clustering. When None, full chromosome clustering is done.
     obs_raw_name : str
         name of the column with raw observed pixel counts
+    nproc : int
+        Number of processes to use for clustering of regions in parallel.
     Returns
     -------
     centroids : pandas.DataFrame
@@ -1092,18 +1355,28 @@ def clustering_step(
         )
 
     # cluster within each regions separately and accumulate the result:
-    pixel_clust_list = []
-    scored_pixels_by_region = scored_df.groupby(assigned_regions_name, observed=True)
-    for region, _df in scored_pixels_by_region:
-        logging.info(f"clustering enriched pixels in region: {region}")
-        # Using genomic corrdinated for clustering, not bin_id
-        pixel_clust = clust_2D_pixels(
-            _df,
-            threshold_cluster=dots_clustering_radius,
-            bin1_id_name="start1",
-            bin2_id_name="start2",
+    # using genomic coordinates for clustering, not bin_id
+    to_clust = partial(
+        clust_2D_pixels,
+        threshold_cluster=dots_clustering_radius,
+        bin1_id_name="start1",
+        bin2_id_name="start2",
+    )
+    scored_pixels_by_region = [
+        _df for _, _df in scored_df.groupby(assigned_regions_name, observed=True)
+    ]
+    # regions are embarrassingly parallel - dispatch them to a Pool:
+    if nproc > 1 and len(scored_pixels_by_region) > 1:
+        logging.info(
+            f"creating a Pool of {nproc} workers to cluster {len(scored_pixels_by_region)} regions"
         )
-        pixel_clust_list.append(pixel_clust)
+        pool = mp.Pool(nproc)
+        try:
+            pixel_clust_list = pool.map(to_clust, scored_pixels_by_region)
+        finally:
+            pool.close()
+    else:
+        pixel_clust_list = [to_clust(_df) for _df in scored_pixels_by_region]
     logging.info("Clustering is complete")
 
     # concatenate clustering results ...
@@ -1137,13 +1410,18 @@ def clustering_step(
     df[assigned_regions_name + "1"] = df[assigned_regions_name].astype(str)
     df[assigned_regions_name + "2"] = df[assigned_regions_name].astype(str)
     # report only centroids with highest Observed:
-    chrom_clust_group = df.groupby(
-        [assigned_regions_name + "1", assigned_regions_name + "2", "c_label"],
-        observed=True,
-    )
-    centroids = df.loc[
-        chrom_clust_group[obs_raw_name].idxmax()
-    ]  # Select the brightest pixel in the cluster
+    # a stable sort on (region1, region2, c_label) with descending observed
+    # counts followed by deduplication keeps the first-encountered maximum
+    # of every cluster - same selection and order as the former
+    # groupby/idxmax, without the hashed groupby and fancy-index gather:
+    cluster_keys = [assigned_regions_name + "1", assigned_regions_name + "2", "c_label"]
+    centroids = df.sort_values(
+        cluster_keys + [obs_raw_name],
+        ascending=[True, True, True, False],
+        kind="stable",
+    ).drop_duplicates(
+        cluster_keys, keep="first"
+    )  # Select the brightest pixel in the cluster
     return centroids
 
 
@@ -1220,45 +1498,33 @@ def cluster_filtering_hiccups(
 
     # ad hoc filtering by enrichment, FDR for singletons etc.
     # employed in Rao et al 2014 HiCCUPS
-    enrichment_fdr_comply = (
+    # predicates are accumulated in a single ndarray mask, avoiding
+    # intermediate boolean Series allocations and index alignment:
+    obs = centroids[obs_raw_name].to_numpy()
+    la_lowleft = centroids["la_exp.lowleft.value"].to_numpy()
+    la_donut = centroids["la_exp.donut.value"].to_numpy()
+    # the strictest enrichment cutoffs (donut/lowleft) go first:
+    enrichment_fdr_comply = (obs > enrichment_factor_d_or_ll * la_lowleft) | (
+        obs > enrichment_factor_d_or_ll * la_donut
+    )
+    enrichment_fdr_comply &= obs > enrichment_factor_d_and_ll * la_lowleft
+    enrichment_fdr_comply &= obs > enrichment_factor_d_and_ll * la_donut
+    enrichment_fdr_comply &= (
+        obs > enrichment_factor_vh * centroids["la_exp.vertical.value"].to_numpy()
+    )
+    enrichment_fdr_comply &= (
+        obs > enrichment_factor_vh * centroids["la_exp.horizontal.value"].to_numpy()
+    )
+    # orphan (singleton) pixels are kept only when their combined q-value
+    # is low enough:
+    enrichment_fdr_comply &= (centroids["c_size"].to_numpy() > 1) | (
         (
-            centroids[obs_raw_name]
-            > enrichment_factor_d_and_ll * centroids["la_exp.lowleft.value"]
-        )
-        & (
-            centroids[obs_raw_name]
-            > enrichment_factor_d_and_ll * centroids["la_exp.donut.value"]
-        )
-        & (
-            centroids[obs_raw_name]
-            > enrichment_factor_vh * centroids["la_exp.vertical.value"]
-        )
-        & (
-            centroids[obs_raw_name]
-            > enrichment_factor_vh * centroids["la_exp.horizontal.value"]
-        )
-        & (
-            (
-                centroids[obs_raw_name]
-                > enrichment_factor_d_or_ll * centroids["la_exp.lowleft.value"]
-            )
-            | (
-                centroids[obs_raw_name]
-                > enrichment_factor_d_or_ll * centroids["la_exp.donut.value"]
-            )
-        )
-        & (
-            (centroids["c_size"] > 1)
-            | (
-                (
-                    centroids["la_exp.lowleft.qval"]
-                    + centroids["la_exp.donut.qval"]
-                    + centroids["la_exp.vertical.qval"]
-                    + centroids["la_exp.horizontal.qval"]
-                )
-                <= FDR_orphan_threshold
-            )
+            centroids["la_exp.lowleft.qval"].to_numpy()
+            + centroids["la_exp.donut.qval"].to_numpy()
+            + centroids["la_exp.vertical.qval"].to_numpy()
+            + centroids["la_exp.horizontal.qval"].to_numpy()
         )
+        <= FDR_orphan_threshold
     )
 
     logging.info(
@@ -1273,6 +1539,75 @@ def cluster_filtering_hiccups(
 # large helper functions wrapping smaller step-specific ones
 ####################################################################
 
+# Per-process state with the read-only inputs of tile scoring. It is
+# populated by _init_tile_scorer - either directly in the parent process
+# (serial execution), or as an initializer of the workers mp.Pool. This
+# way large inputs (expected arrays, weights, kernels) are shipped to
+# every worker once, instead of being pickled with every dispatched tile.
+_tile_scorer_state = {}
+
+
+def _init_tile_scorer(
+    cooler_uri,
+    exp_arrays_by_region,
+    bal_weights,
+    kernels,
+    max_nans_tolerated,
+    band_to_cover,
+    ledges=None,
+    thresholds=None,
+    fused_conv=True,
+    gpu_conv=False,
+):
+    """
+    Stash shared read-only inputs of tile scoring in module globals of the
+    current process. Each worker opens its own cooler from 'cooler_uri'.
+    """
+    score_kwargs = dict(
+        clr=cooler.Cooler(cooler_uri),
+        # wrap per-region expected into LazyToeplitz once per process,
+        # sparing every tile the object construction:
+        exp_arrays_by_region={
+            region: LazyToeplitz(exp_array)
+            for region, exp_array in exp_arrays_by_region.items()
+        },
+        bal_weights=bal_weights,
+        kernels=kernels,
+        max_nans_tolerated=max_nans_tolerated,
+        band_to_cover=band_to_cover,
+        fused_conv=fused_conv,
+        # stack the kernels once per process, not once per tile:
+        kernel_stacks=_stack_kernels(kernels) if (fused_conv or gpu_conv) else None,
+        gpu_conv=gpu_conv,
+    )
+    _tile_scorer_state["to_score"] = partial(score_tile, **score_kwargs)
+    _tile_scorer_state["to_score_raw"] = partial(_score_tile_raw, **score_kwargs)
+    _tile_scorer_state["kernels"] = kernels
+    _tile_scorer_state["ledges"] = ledges
+    _tile_scorer_state["thresholds"] = thresholds
+
+
+def _score_and_histogram_tile(tile_cij):
+    """
+    score a tile and histogram it, using the per-process scoring state.
+    Consumes masked ndarray columns of the raw scored tile directly -
+    the histogram needs neither bin ids nor the slim DataFrame copy
+    that `score_tile` materializes for the extraction pass.
+    """
+    result, mask = _tile_scorer_state["to_score_raw"](tile_cij)
+    obs_arr = result[observed_count_name].to_numpy()[mask]
+    la_exp_arrs = {
+        k: result[f"la_exp.{k}.value"].to_numpy()[mask]
+        for k in _tile_scorer_state["kernels"]
+    }
+    return _histogram_la_exp(obs_arr, la_exp_arrs, _tile_scorer_state["ledges"])
+
+
+def _score_and_extract_tile(tile_cij):
+    """score a tile and extract significant pixels, using the per-process scoring state"""
+    scored_df = _tile_scorer_state["to_score"](tile_cij)
+    return extract_scored_pixels(scored_df, _tile_scorer_state["thresholds"])
+
 
 def scoring_and_histogramming_step(
     clr,
@@ -1294,53 +1629,95 @@ def scoring_and_histogramming_step(
     """
     logging.info(f"convolving {len(tiles)} tiles to build histograms for lambda-bins")
 
-    # to score per tile:
-    to_score = partial(
-        score_tile,
-        clr=clr,
-        expected_indexed=expected_indexed,
-        expected_value_col=expected_value_col,
-        clr_weight_name=clr_weight_name,
-        kernels=kernels,
-        max_nans_tolerated=max_nans_tolerated,
-        band_to_cover=loci_separation_bins,
-    )
+    # fetch balancing weights and per-region expected once, instead of
+    # re-fetching them from the cooler/expected for every tile:
+    bal_weights = clr.bins()[clr_weight_name][:].to_numpy()
+    # use .loc[region, region] for symmetric cis regions to conform with expected v1.0
+    exp_arrays_by_region = {
+        region: expected_indexed.loc[region, region][expected_value_col].to_numpy()
+        for region in sorted({region for region, _, _ in tiles})
+    }
 
-    # to hist per scored chunk:
-    to_hist = partial(histogram_scored_pixels, kernels=kernels, ledges=ledges)
+    # scoring inputs shared by all tiles - shipped to every worker once
+    # via the Pool initializer, instead of being pickled per task:
+    scorer_init_args = (
+        clr.uri,
+        exp_arrays_by_region,
+        bal_weights,
+        kernels,
+        max_nans_tolerated,
+        loci_separation_bins,
+        ledges,
+    )
 
     # compose scoring and histogramming together :
-    job = lambda tile: to_hist(to_score(tile))
+    job = _score_and_histogram_tile
 
     # standard multiprocessing implementation
     if nproc > 1:
         logging.info(f"creating a Pool of {nproc} workers to tackle {len(tiles)} tiles")
-        pool = mp.Pool(nproc)
-        map_ = pool.imap
-        map_kwargs = dict(chunksize=int(np.ceil(len(tiles) / nproc)))
+        pool = mp.Pool(nproc, initializer=_init_tile_scorer, initargs=scorer_init_args)
+        # use unordered map with single-tile chunks: tiles are independent,
+        # their results are reduced commutatively, and they arrive sorted
+        # by decreasing estimated cost - handing them out one at a time
+        # lets faster workers grab more work and keeps the heavy
+        # near-diagonal tiles spread across the pool:
+        map_ = pool.imap_unordered
+        map_kwargs = dict(chunksize=1)
     else:
         logging.info("fallback to serial implementation.")
+        _init_tile_scorer(*scorer_init_args)
         map_ = map
         map_kwargs = {}
+    # now we need to combine/sum all of the histograms for different kernels.
+    # per-chunk histograms are uniform in the lambda-dimension, so accumulate
+    # them into plain numpy arrays as they stream from the pool, growing the
+    # observed-counts dimension as needed. This keeps peak memory at a single
+    # chunk's histogram and avoids pairwise DataFrame index alignment.
+    num_lbins = len(ledges) - 1
+    totals = {k: np.zeros((1, num_lbins), dtype=np.int64) for k in kernels}
+    # observed counts ever seen in any chunk - the index of the final histogram:
+    obs_seen = np.zeros(1, dtype=bool)
     try:
         # consider using
         # https://github.com/mirnylab/cooler/blob/9e72ee202b0ac6f9d93fd2444d6f94c524962769/cooler/tools.py#L59
         histogram_chunks = map_(job, tiles, **map_kwargs)
+        for uniq_obs, counts_by_kernel in histogram_chunks:
+            if len(uniq_obs) and (uniq_obs.max() + 1 > len(obs_seen)):
+                # grow the observed-counts dimension of the accumulators:
+                new_size = uniq_obs.max() + 1
+                obs_seen = np.r_[
+                    obs_seen, np.zeros(new_size - len(obs_seen), dtype=bool)
+                ]
+                for k in kernels:
+                    totals[k] = np.vstack(
+                        [
+                            totals[k],
+                            np.zeros(
+                                (new_size - len(totals[k]), num_lbins),
+                                dtype=np.int64,
+                            ),
+                        ]
+                    )
+            # uniq_obs are unique within a chunk - plain fancy-index add:
+            for k in kernels:
+                totals[k][uniq_obs] += counts_by_kernel[k]
+            obs_seen[uniq_obs] = True
     finally:
         if nproc > 1:
             pool.close()
 
-    # now we need to combine/sum all of the histograms for different kernels:
-    def _sum_hists(hx, hy):
-        # perform a DataFrame summation for every value of the dictionary:
-        hxy = {}
-        for k in kernels:
-            hxy[k] = hx[k].add(hy[k], fill_value=0).fillna(0).astype(np.int64)
-        # returning the sum:
-        return hxy
-
-    # TODO consider more efficient implementation to accumulate histograms:
-    final_hist = reduce(_sum_hists, histogram_chunks)
+    # keep only the rows of observed counts that actually occured - same
+    # index as the union of the per-chunk histograms:
+    obs_vals = np.flatnonzero(obs_seen)
+    final_hist = {
+        k: pd.DataFrame(
+            totals[k][obs_vals],
+            index=pd.Index(obs_vals, name=observed_count_name),
+            columns=pd.IntervalIndex.from_breaks(ledges, name=f"la_exp.{k}.value"),
+        )
+        for k in kernels
+    }
     # we have to make sure there is nothing in the last lambda-bin
     # this is a temporary implementation detail, until we implement dynamic lambda-bins
     for k in kernels:
@@ -1383,35 +1760,45 @@ def scoring_and_extraction_step(
     """
     logging.info(f"convolving {len(tiles)} tiles to extract enriched pixels")
 
-    # to score per tile:
-    to_score = partial(
-        score_tile,
-        clr=clr,
-        expected_indexed=expected_indexed,
-        expected_value_col=expected_value_col,
-        clr_weight_name=clr_weight_name,
-        kernels=kernels,
-        max_nans_tolerated=max_nans_tolerated,
-        band_to_cover=loci_separation_bins,
-    )
+    # fetch balancing weights and per-region expected once, instead of
+    # re-fetching them from the cooler/expected for every tile:
+    bal_weights = clr.bins()[clr_weight_name][:].to_numpy()
+    # use .loc[region, region] for symmetric cis regions to conform with expected v1.0
+    exp_arrays_by_region = {
+        region: expected_indexed.loc[region, region][expected_value_col].to_numpy()
+        for region in sorted({region for region, _, _ in tiles})
+    }
 
-    # to hist per scored chunk:
-    to_extract = partial(
-        extract_scored_pixels,
-        thresholds=thresholds,
+    # scoring inputs shared by all tiles - shipped to every worker once
+    # via the Pool initializer, instead of being pickled per task:
+    scorer_init_args = (
+        clr.uri,
+        exp_arrays_by_region,
+        bal_weights,
+        kernels,
+        max_nans_tolerated,
+        loci_separation_bins,
+        ledges,
+        thresholds,
     )
 
-    # compose scoring and histogramming together
-    job = lambda tile: to_extract(to_score(tile))
+    # compose scoring and extraction together
+    job = _score_and_extract_tile
 
     # standard multiprocessing implementation
     if nproc > 1:
         logging.info(f"creating a Pool of {nproc} workers to tackle {len(tiles)} tiles")
-        pool = mp.Pool(nproc)
-        map_ = pool.imap
-        map_kwargs = dict(chunksize=int(np.ceil(len(tiles) / nproc)))
+        pool = mp.Pool(nproc, initializer=_init_tile_scorer, initargs=scorer_init_args)
+        # use unordered map with single-tile chunks: tiles are independent,
+        # their results are reduced commutatively, and they arrive sorted
+        # by decreasing estimated cost - handing them out one at a time
+        # lets faster workers grab more work and keeps the heavy
+        # near-diagonal tiles spread across the pool:
+        map_ = pool.imap_unordered
+        map_kwargs = dict(chunksize=1)
     else:
         logging.info("fallback to serial implementation.")
+        _init_tile_scorer(*scorer_init_args)
         map_ = map
         map_kwargs = {}
     try:
@@ -1603,6 +1990,17 @@ def dots(
             clr, view_df, kernel_half_width, tile_size_bins, loci_separation_bins
         )
     )
+    # dispatch the most expensive tiles first (longest-processing-time-first
+    # scheduling): near-diagonal tiles carry far denser pixels than
+    # off-diagonal ones, and starting with them keeps workers from idling
+    # on a heavy tail at the end of both scoring passes. Estimate per-tile
+    # cost as tile area over its distance to the diagonal:
+    tiles.sort(
+        key=lambda tile: (tile[1][1] - tile[1][0])
+        * (tile[2][1] - tile[2][0])
+        / (abs(tile[1][0] - tile[2][0]) + 1),
+        reverse=True,
+    )
 
     # 1. Calculate genome-wide histograms of scores.
     time_start = time.perf_counter()
@@ -1651,8 +2049,11 @@ def dots(
 
     # annotate enriched pixels
     filtered_pixels_qvals = annotate_pixels_with_qvalues(filtered_pixels, qvalues)
+    # materialize the bin table once, so that annotate works with an
+    # in-memory DataFrame instead of range-querying the cooler:
+    bins_annotation = clr.bins()[["chrom", "start", "end"]][:]
     filtered_pixels_annotated = cooler.annotate(
-        filtered_pixels_qvals, clr.bins()[["chrom", "start", "end"]], replace=True
+        filtered_pixels_qvals, bins_annotation, replace=True
     )
     if not clustering_radius:
         # TODO: make sure returned DataFrame has the same columns as "postprocessed_calls"
@@ -1672,6 +2073,7 @@ def dots(
     centroids = clustering_step(
         filtered_pixels_annotated,
         clustering_radius,
+        nproc=nproc,
     ).reset_index(drop=True)
 
     # columns to return post-clustering
@@ -852,6 +852,38 @@ class LazyToeplitz(cooler.core._IndexingMixin):
 
         return toeplitz(c, r)
 
+    def strided_view(self, key):
+        """
+        Same query as ``__getitem__``, but returns a read-only strided view
+        into a 1D buffer of the spanned diagonals instead of materializing
+        the dense tile, i.e. uses O(H + W) memory for an (H, W) query.
+        Copy the result before modifying it.
+        """
+        slc0, slc1 = self._unpack_index(key)
+        i0, i1 = self._process_slice(slc0, self.shape[0])
+        j0, j1 = self._process_slice(slc1, self.shape[1])
+        H, W = i1 - i0, j1 - j0
+        if H <= 0 or W <= 0:
+            return np.empty((max(H, 0), max(W, 0)))
+        C, R = np.asarray(self._c), np.asarray(self._r)
+        # diagonal offsets d = i - j spanned by the tile, ascending:
+        offsets = np.arange(i0 - j1 + 1, i1 - j0)
+        # tile value along each diagonal: from the column `c` on and below
+        # the main diagonal (d >= 0), from the row `r` above it (d < 0):
+        diag_values = np.where(
+            offsets >= 0,
+            C[np.clip(offsets, 0, None)],
+            R[np.clip(-offsets, 0, None)],
+        )
+        # element [i, j] of the tile equals diag_values[(W - 1) + i - j]:
+        (stride,) = diag_values.strides
+        return np.lib.stride_tricks.as_strided(
+            diag_values[W - 1 :],
+            shape=(H, W),
+            strides=(stride, -stride),
+            writeable=False,
+        )
+
 
 def get_kernel(w, p, ktype):
     """
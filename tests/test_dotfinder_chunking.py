@@ -113,6 +113,27 @@ def test_adjusted_expected_tile_some_nans():
     assert len(res) > len(mock_res)
 
 
+def test_adjusted_expected_tile_some_nans_fused_conv():
+    print("Running tile some nans la_exp test, fused convolution")
+    # fused numba-convolution must match the per-kernel scipy one:
+    common_kwargs = dict(
+        origin_ij=(0, 0),
+        observed=mock_M_raw,  # should be RAW ...
+        expected=mock_E_ice,
+        bal_weights=mock_v_ice,
+        kernels={"donut": kernel, "footprint": np.ones_like(kernel)},
+    )
+    res = get_adjusted_expected_tile_some_nans(fused_conv=False, **common_kwargs)
+    res_fused = get_adjusted_expected_tile_some_nans(fused_conv=True, **common_kwargs)
+
+    # integer part of DataFrames must equal exactly:
+    int_cols = ["bin1_id", "bin2_id", "la_exp.donut.nnans", "la_exp.footprint.nnans"]
+    assert res_fused[int_cols].equals(res[int_cols])
+    # compare floating point part separately:
+    for col in ["la_exp.donut.value", "la_exp.footprint.value", "exp.raw"]:
+        assert np.allclose(res_fused[col], res[col], equal_nan=True)
+
+
 def test_adjusted_expected_tile_some_nans_and_square_tiling():
     print("Running tile some nans la_exp test + square tiling")
     # first, generate that locally-adjusted expected:
@@ -59,6 +59,21 @@ def test_tril_with_overlap():
         assert np.allclose(L[si, sj], T[si, sj])
 
 
+def test_strided_view():
+    for si, sj in [
+        (slice(10, 20), slice(10, 20)),
+        (slice(10, 20), slice(30, 40)),
+        (slice(30, 40), slice(10, 20)),
+        (slice(13, 22), slice(15, 25)),
+        (slice(15, 25), slice(10, 18)),
+        (slice(10, 40), slice(20, 30)),
+        (slice(10, 10), slice(20, 30)),
+    ]:
+        view = L.strided_view((si, sj))
+        assert not view.flags.writeable or view.size == 0
+        assert np.allclose(view, T[si, sj])
+
+
 def test_nested():
     for si, sj in [
         (slice(10, 40), slice(20, 30)),